@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from supabase import create_client
 import anthropic
@@ -78,6 +80,7 @@ def db_load_session_projects(session_id):
                 "category": row["category"],
                 "justification": row["justification"],
                 "answers": row["answers"] if row["answers"] else {},
+                "scoring_fingerprint": row.get("scoring_fingerprint"),
                 "timestamp": row["created_at"]
             })
         return projects
@@ -96,7 +99,8 @@ def db_add_project(session_id, project_data):
             "business_value": project_data["business_value"],
             "category": project_data["category"],
             "justification": project_data["justification"],
-            "answers": project_data.get("answers", {})
+            "answers": project_data.get("answers", {}),
+            "scoring_fingerprint": project_data.get("scoring_fingerprint")
         }).execute()
 
         # Update session project count and timestamp
@@ -130,16 +134,131 @@ def db_delete_project(project_db_id, session_id):
         st.error(f"Failed to delete project: {str(e)}")
         return False
 
-def db_delete_session(session_id):
-    """Delete a session and all its projects from Supabase"""
+# PostgREST caps each response at 1000 rows by default, so larger reads are paged
+STALE_PAGE_SIZE = 1000
+
+def stale_projects_filter(fingerprint):
+    """PostgREST filter matching projects not scored with the given fingerprint"""
+    return f"scoring_fingerprint.is.null,scoring_fingerprint.neq.{fingerprint}"
+
+def db_count_stale_projects(fingerprint):
+    """Count projects whose scores were produced with different scoring inputs"""
+    try:
+        response = (
+            supabase.table("projects")
+            .select("id", count="exact")
+            .or_(stale_projects_filter(fingerprint))
+            .limit(1)
+            .execute()
+        )
+        return response.count or 0
+    except Exception as e:
+        st.error(f"Failed to count stale projects: {str(e)}")
+        return None
+
+def db_get_stale_projects(fingerprint):
+    """Load projects whose scores were produced with different scoring inputs"""
+    try:
+        projects = []
+        start = 0
+        while True:
+            response = (
+                supabase.table("projects")
+                .select("id, session_id, project_name, description, answers")
+                .or_(stale_projects_filter(fingerprint))
+                .order("created_at")
+                .order("id")
+                .range(start, start + STALE_PAGE_SIZE - 1)
+                .execute()
+            )
+            page = response.data or []
+            projects.extend(page)
+            if len(page) < STALE_PAGE_SIZE:
+                return projects
+            start += STALE_PAGE_SIZE
+    except Exception as e:
+        st.error(f"Failed to load stale projects: {str(e)}")
+        return []
+
+def db_update_project_scores(project_db_id, result, fingerprint):
+    """Overwrite a project's scores and stamp the fingerprint they were computed with"""
+    try:
+        supabase.table("projects").update({
+            "tech_feasibility": result["tech_feasibility"],
+            "business_value": result["business_value"],
+            "category": result["category"],
+            "justification": result["justification"],
+            "scoring_fingerprint": fingerprint
+        }).eq("id", project_db_id).execute()
+        return True
+    except Exception as e:
+        st.error(f"Failed to update project scores: {str(e)}")
+        return False
+
+def db_touch_session(session_id):
+    """Update a session's last-modified timestamp in Supabase"""
+    try:
+        supabase.table("sessions").update({
+            "last_modified": datetime.now().isoformat()
+        }).eq("id", session_id).execute()
+        return True
+    except Exception as e:
+        st.error(f"Failed to update session: {str(e)}")
+        return False
+
+def db_delete_sessions(session_ids):
+    """Delete sessions and all their projects from Supabase in one transaction"""
+    if not session_ids:
+        return True
     try:
-        supabase.table("projects").delete().eq("session_id", session_id).execute()
-        supabase.table("sessions").delete().eq("id", session_id).execute()
+        supabase.rpc("delete_sessions", {"session_ids": list(session_ids)}).execute()
         return True
     except Exception as e:
-        st.error(f"Failed to delete session: {str(e)}")
+        st.error(f"Failed to delete sessions: {str(e)}")
         return False
 
+def db_delete_session(session_id):
+    """Delete a session and all its projects from Supabase"""
+    return db_delete_sessions([session_id])
+
+# --- Analytics Functions ---
+# These read the SQL views from supabase/migrations/002_portfolio_analytics.sql,
+# which are backed by trigger-maintained aggregates rather than the projects table.
+# Pass a session_id to scope a query to one session, or None for all sessions.
+def db_query_analytics(view, session_id=None, order_by=None):
+    """Read rows from a per-session or global analytics view"""
+    try:
+        if session_id is None:
+            query = supabase.table(f"analytics_global_{view}").select("*")
+        else:
+            query = supabase.table(f"analytics_{view}").select("*").eq("session_id", session_id)
+        if order_by:
+            query = query.order(order_by)
+        response = query.execute()
+        return response.data or []
+    except Exception as e:
+        st.error(f"Failed to load analytics: {str(e)}")
+        return []
+
+def db_get_category_counts(session_id=None):
+    """Project count per category, e.g. {"low_hanging": 4, "disruptive": 2}"""
+    rows = db_query_analytics("category_counts", session_id)
+    return {row["category"]: row["project_count"] for row in rows}
+
+def db_get_score_histogram(session_id=None):
+    """Project count per integer score bucket for each scoring dimension"""
+    histogram = {
+        "business_value": {bucket: 0 for bucket in range(11)},
+        "tech_feasibility": {bucket: 0 for bucket in range(11)},
+    }
+    for row in db_query_analytics("score_histogram", session_id):
+        histogram[row["dimension"]][row["bucket"]] = row["project_count"]
+    return histogram
+
+def db_get_score_trend(session_id=None):
+    """Daily project counts and average scores, ordered by creation day"""
+    return db_query_analytics("daily_trend", session_id, order_by="day")
+
 # --- Initialize session state ---
 if 'projects' not in st.session_state:
     st.session_state.projects = []
@@ -257,34 +376,20 @@ INTAKE_QUESTIONS = {
     ]
 }
 
-def analyze_with_claude(project_name, description, answers):
-    """Use Claude to intelligently score the project based on benchmarks and answers"""
+# Claude model and prompt used for scoring. Changing either (or the benchmarks
+# and score maps above) changes SCORING_FINGERPRINT and marks stored scores stale.
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
-    # Check if API key is available (try Streamlit secrets first, then env var)
-    api_key = None
-    try:
-        api_key = st.secrets.get("ANTHROPIC_API_KEY")
-    except Exception:
-        pass
-    if not api_key:
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if not api_key:
-        st.warning("Claude API key not found. Using fallback scoring method.")
-        return calculate_scores_fallback(answers)
-
-    try:
-        client = anthropic.Anthropic(api_key=api_key)
-
-        prompt = f"""Analyze this AI project and provide scoring based on benchmarks and the intake questionnaire.
+SCORING_PROMPT_TEMPLATE = """Analyze this AI project and provide scoring based on benchmarks and the intake questionnaire.
 
 Project Name: {project_name}
 Description: {description}
 
 Benchmark Use Cases (for reference):
-{json.dumps(BENCHMARK_USE_CASES, indent=2)}
+{benchmarks}
 
 User Answers:
-{json.dumps(answers, indent=2)}
+{answers}
 
 Based on the project name, description, similarity to benchmark use cases, and the questionnaire answers, provide:
 1. A tech_feasibility score (1-10, where 10 is most feasible)
@@ -306,28 +411,130 @@ Respond ONLY with valid JSON in this exact format:
     "justification": "<your analysis>"
 }}"""
 
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1000,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+def render_benchmarks():
+    """Benchmark use cases as JSON, exactly as they appear in the scoring prompt"""
+    return json.dumps(BENCHMARK_USE_CASES, indent=2)
+
+def compute_scoring_fingerprint():
+    """Hash every input that stored scores depend on (model, prompt, benchmarks, score maps)"""
+    score_maps = {
+        q["id"]: q["score_map"]
+        for questions in INTAKE_QUESTIONS.values()
+        for q in questions
+        if "score_map" in q
+    }
+    inputs = {
+        "model": CLAUDE_MODEL,
+        "prompt": SCORING_PROMPT_TEMPLATE,
+        "benchmarks": render_benchmarks(),
+        "score_maps": score_maps,
+    }
+    payload = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
 
-        response_text = message.content[0].text.strip()
+SCORING_FINGERPRINT = compute_scoring_fingerprint()
 
-        # Extract JSON from response
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+def get_anthropic_api_key():
+    """Read the Anthropic API key from Streamlit secrets, then the environment"""
+    api_key = None
+    try:
+        api_key = st.secrets.get("ANTHROPIC_API_KEY")
+    except Exception:
+        pass
+    if not api_key:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+    return api_key
+
+def request_claude_scores(client, project_name, description, answers):
+    """Send the scoring prompt to Claude and parse its JSON reply (raises on failure)"""
+    prompt = SCORING_PROMPT_TEMPLATE.format(
+        project_name=project_name,
+        description=description,
+        benchmarks=render_benchmarks(),
+        answers=json.dumps(answers, indent=2)
+    )
 
-        result = json.loads(response_text)
-        return result
+    message = client.messages.create(
+        model=CLAUDE_MODEL,
+        max_tokens=1000,
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
+
+    response_text = message.content[0].text.strip()
+
+    # Extract JSON from response
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
+
+    return json.loads(response_text)
+
+def analyze_with_claude(project_name, description, answers):
+    """Score the project with Claude; returns (result, used_claude), falling back to questionnaire scores"""
+
+    # Check if API key is available (try Streamlit secrets first, then env var)
+    api_key = get_anthropic_api_key()
+    if not api_key:
+        st.warning("Claude API key not found. Using fallback scoring method.")
+        return calculate_scores_fallback(answers), False
+
+    try:
+        client = anthropic.Anthropic(api_key=api_key)
+        return request_claude_scores(client, project_name, description, answers), True
 
     except Exception as e:
         st.warning(f"Claude analysis failed ({str(e)}). Using fallback scoring.")
-        return calculate_scores_fallback(answers)
+        return calculate_scores_fallback(answers), False
+
+def rescore_stale_projects(batch_size=10, max_workers=4, on_progress=None):
+    """Re-score stale projects with Claude in bounded-concurrency batches, saving each result as it arrives"""
+    summary = {"total": 0, "rescored": 0, "failed": 0, "error": None}
+
+    api_key = get_anthropic_api_key()
+    if not api_key:
+        summary["error"] = "Claude API key not found. Re-scoring requires Claude."
+        return summary
+    client = anthropic.Anthropic(api_key=api_key)
+
+    stale = db_get_stale_projects(SCORING_FINGERPRINT)
+    total = len(stale)
+    summary["total"] = total
+    if not stale:
+        return summary
+
+    def score(row):
+        return request_claude_scores(client, row["project_name"], row["description"], row["answers"] or {})
+
+    touched_sessions = set()
+    done = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for start in range(0, total, batch_size):
+            batch = stale[start:start + batch_size]
+            futures = {executor.submit(score, row): row for row in batch}
+            # Database writes stay on this thread; only the Claude calls run in the pool
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    result = future.result()
+                    ok = db_update_project_scores(row["id"], result, SCORING_FINGERPRINT)
+                except Exception:
+                    ok = False
+                if ok:
+                    summary["rescored"] += 1
+                    touched_sessions.add(row["session_id"])
+                else:
+                    summary["failed"] += 1
+                done += 1
+                if on_progress:
+                    on_progress(done, total, row["project_name"])
+
+    for session_id in touched_sessions:
+        db_touch_session(session_id)
+
+    return summary
 
 def calculate_scores_fallback(answers):
     """Fallback scoring method if Claude API is not available"""
@@ -432,6 +639,13 @@ def create_prioritization_chart(projects_df):
 
     st.plotly_chart(fig, use_container_width=True)
 
+def clear_current_session_if_deleted(session_ids):
+    """Unload the current session if it was among the deleted ones"""
+    if st.session_state.current_session_id in session_ids:
+        st.session_state.current_session_name = None
+        st.session_state.current_session_id = None
+        st.session_state.projects = []
+
 def main():
     st.title("\U0001f3af AI Project Prioritization Tool")
     st.markdown("### Intelligent scoring based on benchmarks and your intake questionnaire")
@@ -444,7 +658,9 @@ def main():
             "\u2795 Add Project",
             "\U0001f4cb View All Projects",
             "\U0001f4be Export Data",
-            "\U0001f4c2 Sessions"
+            "\U0001f4c2 Sessions",
+            "\U0001f4c8 Analytics",
+            "\U0001f504 Re-score"
         ])
 
         st.markdown("---")
@@ -536,7 +752,7 @@ def main():
                     st.error("Please provide project name and description.")
                 else:
                     with st.spinner("\U0001f916 Analyzing your project with AI benchmarking..."):
-                        result = analyze_with_claude(
+                        result, used_claude = analyze_with_claude(
                             answers["project_name"],
                             answers["description"],
                             answers
@@ -550,6 +766,8 @@ def main():
                             "category": result["category"],
                             "justification": result["justification"],
                             "answers": answers,
+                            # Fallback scores stay unstamped so the Re-score job picks them up
+                            "scoring_fingerprint": SCORING_FINGERPRINT if used_claude else None,
                         }
 
                         # Save to Supabase
@@ -683,13 +901,22 @@ def main():
                 with col3:
                     if st.button("\U0001f5d1\ufe0f Delete", key=f"del_{session['id']}"):
                         if db_delete_session(session['id']):
-                            if st.session_state.current_session_id == session['id']:
-                                st.session_state.current_session_name = None
-                                st.session_state.current_session_id = None
-                                st.session_state.projects = []
+                            clear_current_session_if_deleted([session['id']])
                             st.rerun()
 
                 st.markdown("---")
+
+            # --- Bulk Delete ---
+            session_names = {session['id']: session['name'] for session in sessions}
+            selected_ids = st.multiselect(
+                "Select sessions to delete",
+                list(session_names.keys()),
+                format_func=lambda session_id: session_names[session_id]
+            )
+            if st.button(f"\U0001f5d1\ufe0f Delete {len(selected_ids)} selected session(s)", disabled=not selected_ids):
+                if db_delete_sessions(selected_ids):
+                    clear_current_session_if_deleted(selected_ids)
+                    st.rerun()
         else:
             st.info("No saved sessions yet. Create your first one above!")
 
@@ -723,5 +950,137 @@ def main():
             except Exception as e:
                 st.error(f"Failed to import: {str(e)}")
 
+    elif page == "\U0001f4c8 Analytics":
+        st.header("Portfolio Analytics")
+        st.markdown("Org-wide reporting across every saved session, computed in the database.")
+
+        sessions = db_get_all_sessions()
+        session_names = {session["id"]: session["name"] for session in sessions}
+        scope_id = st.selectbox(
+            "Scope",
+            [None] + list(session_names.keys()),
+            format_func=lambda session_id: "All sessions" if session_id is None else session_names[session_id]
+        )
+
+        category_counts = db_get_category_counts(scope_id)
+        total = sum(category_counts.values())
+
+        if not total:
+            st.info("No scored projects in this scope yet.")
+            st.stop()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Projects", total)
+        with col2:
+            st.metric("Quick Wins", category_counts.get("low_hanging", 0))
+        with col3:
+            st.metric("Disruptive", category_counts.get("disruptive", 0))
+        with col4:
+            st.metric("Incremental", category_counts.get("incremental", 0))
+
+        st.markdown("---")
+        st.subheader("Score Distribution")
+        histogram = db_get_score_histogram(scope_id)
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            x=list(histogram["business_value"].keys()),
+            y=list(histogram["business_value"].values()),
+            name="Business Value",
+            marker_color="#10b981"
+        ))
+        fig.add_trace(go.Bar(
+            x=list(histogram["tech_feasibility"].keys()),
+            y=list(histogram["tech_feasibility"].values()),
+            name="Tech Feasibility",
+            marker_color="#6366f1"
+        ))
+        fig.update_layout(
+            barmode="group",
+            xaxis_title="Score",
+            yaxis_title="Projects",
+            xaxis=dict(dtick=1),
+            height=400
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("Trend by Creation Date")
+        trend = db_get_score_trend(scope_id)
+        if trend:
+            trend_df = pd.DataFrame(trend)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=trend_df["day"], y=trend_df["avg_business_value"],
+                mode="lines+markers", name="Avg Business Value", line=dict(color="#10b981")
+            ))
+            fig.add_trace(go.Scatter(
+                x=trend_df["day"], y=trend_df["avg_tech_feasibility"],
+                mode="lines+markers", name="Avg Tech Feasibility", line=dict(color="#6366f1")
+            ))
+            fig.add_trace(go.Bar(
+                x=trend_df["day"], y=trend_df["project_count"],
+                name="Projects Added", marker_color="rgba(156,163,175,0.4)", yaxis="y2"
+            ))
+            fig.update_layout(
+                yaxis=dict(title="Average Score", range=[0, 10.5]),
+                yaxis2=dict(title="Projects Added", overlaying="y", side="right"),
+                height=400
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+    elif page == "\U0001f504 Re-score":
+        st.header("Re-score Stale Projects")
+        st.markdown(
+            "Every stored score is stamped with a fingerprint of the model, prompt, benchmarks "
+            "and questionnaire score maps it was computed with. When any of those change, "
+            "affected projects become stale and can be re-scored here."
+        )
+        st.caption(f"Current scoring fingerprint: `{SCORING_FINGERPRINT}`")
+
+        stale_count = db_count_stale_projects(SCORING_FINGERPRINT)
+        if stale_count is None:
+            st.stop()
+        if not stale_count:
+            st.success("\u2705 All stored scores are up to date.")
+            st.stop()
+
+        st.warning(f"{stale_count} project(s) across all sessions have stale scores.")
+
+        if not get_anthropic_api_key():
+            st.error(
+                "Claude API key not found. Re-scoring requires Claude; set ANTHROPIC_API_KEY "
+                "in your secrets to re-score stale projects."
+            )
+            st.stop()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            batch_size = st.number_input("Batch size", min_value=1, max_value=100, value=10)
+        with col2:
+            max_workers = st.number_input("Concurrent Claude calls", min_value=1, max_value=16, value=4)
+
+        if st.button("\U0001f504 Re-score stale projects"):
+            progress = st.progress(0.0)
+            status = st.empty()
+
+            def on_progress(done, total, project_name):
+                progress.progress(done / total)
+                status.caption(f"{done}/{total} \u2014 {project_name}")
+
+            summary = rescore_stale_projects(int(batch_size), int(max_workers), on_progress)
+
+            if st.session_state.current_session_id:
+                st.session_state.projects = db_load_session_projects(st.session_state.current_session_id)
+
+            if summary["error"]:
+                st.error(summary["error"])
+            elif summary["failed"]:
+                st.warning(
+                    f"Re-scored {summary['rescored']} of {summary['total']} project(s); "
+                    f"{summary['failed']} failed and will be retried on the next run."
+                )
+            else:
+                st.success(f"\u2705 Re-scored {summary['rescored']} project(s).")
+
 if __name__ == "__main__":
     main()
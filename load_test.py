@@ -0,0 +1,606 @@
+"""Load-test harness for the AI Project Prioritization app.
+
+Starts a real Streamlit server for the app, backed by in-memory fake Supabase and
+Claude clients, then connects N simulated users over the same websocket protocol
+the browser uses. Each user runs a realistic flow (load session, add project,
+view dashboard, export) and the harness reports throughput, p50/p99 rerun
+latency, and the server's RSS and thread count at each concurrency level.
+
+Backend latency is simulated with blocking sleeps, so the synchronous Supabase
+calls and the Claude call inside the form handler hold a script thread exactly
+as they would in production.
+
+Usage:
+    python load_test.py --users 1 5 10 25 --iterations 3
+    python load_test.py --users 50 --db-latency-ms 30 --claude-latency-ms 2000
+
+Requires the ``websockets`` package (listed in requirements.txt).
+``psutil`` is used for server metrics when available; otherwise they are read
+from /proc, which is Linux-only.
+"""
+import argparse
+import json
+import os
+import runpy
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_prioritization_app.py")
+
+PAGE_DASHBOARD = "\U0001f4ca Dashboard"
+PAGE_ADD_PROJECT = "\u2795 Add Project"
+PAGE_EXPORT = "\U0001f4be Export Data"
+PAGE_SESSIONS = "\U0001f4c2 Sessions"
+
+
+# --- Fake Supabase ---
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Minimal stand-in for the postgrest query builder used by the app"""
+
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.want_count = False
+        self.filters = []
+        self.order_by = []
+        self.start = 0
+        self.stop = None
+
+    def select(self, columns="*", count=None):
+        self.action = "select"
+        self.want_count = count is not None
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload):
+        self.action, self.payload = "upsert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, expression):
+        clauses = []
+        for clause in expression.split(","):
+            column, op, value = clause.split(".", 2)
+            if op == "is" and value == "null":
+                clauses.append(lambda row, c=column: row.get(c) is None)
+            elif op == "neq":
+                clauses.append(lambda row, c=column, v=value: row.get(c) != v)
+            elif op == "eq":
+                clauses.append(lambda row, c=column, v=value: row.get(c) == v)
+        self.filters.append(lambda row: any(clause(row) for clause in clauses))
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.stop = self.start + count
+        return self
+
+    def range(self, start, end):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def execute(self):
+        return self.db.execute(self)
+
+
+class FakeRpc:
+    def __init__(self, db, name, params):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        return self.db.execute_rpc(self.name, self.params)
+
+
+class FakeSupabase:
+    """Thread-safe in-memory tables with a fixed per-request latency"""
+
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+        self.tables = {"sessions": [], "projects": []}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        return FakeRpc(self, name, params)
+
+    def _round_trip(self):
+        with self.lock:
+            self.requests += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def execute(self, query):
+        self._round_trip()
+        with self.lock:
+            rows = self.tables.setdefault(query.table, [])
+            matched = [row for row in rows if all(f(row) for f in query.filters)]
+
+            if query.action == "select":
+                # Stable sorts applied last-to-first give multi-column ordering
+                for column, desc in reversed(query.order_by):
+                    matched.sort(key=lambda row: row.get(column) or "", reverse=desc)
+                count = len(matched) if query.want_count else None
+                data = [dict(row) for row in matched[query.start:query.stop]]
+                return FakeResponse(data, count)
+
+            if query.action == "insert":
+                row = dict(query.payload)
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("created_at", datetime.now().isoformat())
+                rows.append(row)
+                return FakeResponse([dict(row)])
+
+            if query.action == "upsert":
+                row = dict(query.payload)
+                existing = next((r for r in rows if r.get("id") == row.get("id")), None)
+                if existing:
+                    existing.update(row)
+                else:
+                    rows.append(row)
+                return FakeResponse([dict(row)])
+
+            if query.action == "update":
+                for row in matched:
+                    row.update(query.payload)
+                return FakeResponse([dict(row) for row in matched])
+
+            if query.action == "delete":
+                self.tables[query.table] = [row for row in rows if row not in matched]
+                return FakeResponse([dict(row) for row in matched])
+
+        raise ValueError(f"Unsupported action: {query.action}")
+
+    def execute_rpc(self, name, params):
+        self._round_trip()
+        with self.lock:
+            if name == "delete_sessions":
+                ids = set(params["session_ids"])
+                before = len(self.tables["sessions"])
+                self.tables["sessions"] = [s for s in self.tables["sessions"] if s["id"] not in ids]
+                self.tables["projects"] = [p for p in self.tables["projects"] if p["session_id"] not in ids]
+                return FakeResponse(before - len(self.tables["sessions"]))
+        raise ValueError(f"Unsupported RPC: {name}")
+
+
+# --- Fake Claude ---
+class FakeMessages:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+
+    def create(self, model, max_tokens, messages):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        prompt = messages[0]["content"]
+        seed = sum(map(ord, prompt)) % 5
+        result = {
+            "tech_feasibility": 5 + seed,
+            "business_value": 9 - seed,
+            "category": "low_hanging" if seed >= 2 else "disruptive",
+            "justification": "Scored by the load-test fake backend."
+        }
+        text = "```json\n" + json.dumps(result) + "\n```"
+        return types.SimpleNamespace(content=[types.SimpleNamespace(text=text)])
+
+
+def install_fake_backends(db, claude_latency_s):
+    """Replace the supabase and anthropic modules the app imports with the fakes"""
+    supabase_module = types.ModuleType("supabase")
+    supabase_module.IS_LOAD_TEST_FAKE = True
+    supabase_module.create_client = lambda url, key: db
+    sys.modules["supabase"] = supabase_module
+
+    class Anthropic:
+        def __init__(self, api_key=None):
+            self.messages = FakeMessages(claude_latency_s)
+
+    anthropic_module = types.ModuleType("anthropic")
+    anthropic_module.Anthropic = Anthropic
+    sys.modules["anthropic"] = anthropic_module
+
+    os.environ.setdefault("SUPABASE_URL", "http://fake-supabase.local")
+    os.environ.setdefault("SUPABASE_KEY", "fake-key")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "fake-key")
+
+
+def seed_sessions(db, count, projects_per_session):
+    """Create one session per simulated user, each pre-filled with projects"""
+    now = datetime.now().isoformat()
+    with db.lock:
+        for i in range(count):
+            session_id = f"load_test_{i}"
+            db.tables["sessions"].append({
+                "id": session_id,
+                "name": f"Load Test {i}",
+                "project_count": projects_per_session,
+                "last_modified": now
+            })
+            for j in range(projects_per_session):
+                db.tables["projects"].append({
+                    "id": str(uuid.uuid4()),
+                    "session_id": session_id,
+                    "project_name": f"Seed Project {j}",
+                    "description": "Seeded for load testing",
+                    "tech_feasibility": 1 + (j % 10),
+                    "business_value": 10 - (j % 10),
+                    "category": ["low_hanging", "disruptive", "incremental"][j % 3],
+                    "justification": "Seeded for load testing",
+                    "answers": {"revenue_impact": "Medium ($100K-$1M)"},
+                    "scoring_fingerprint": None,
+                    "created_at": now
+                })
+
+
+# --- Server side ---
+def serve(args):
+    """Entry point when Streamlit runs this file: install fakes once, then run the app"""
+    if not getattr(sys.modules.get("supabase"), "IS_LOAD_TEST_FAKE", False):
+        db = FakeSupabase(latency_s=args.db_latency_ms / 1000)
+        seed_sessions(db, args.seed_sessions, args.seed_projects)
+        install_fake_backends(db, args.claude_latency_ms / 1000)
+    runpy.run_path(APP_PATH, run_name="__main__")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(users, args):
+    """Start a fresh Streamlit server seeded with one session per user"""
+    port = free_port()
+    log = tempfile.TemporaryFile()
+    command = [
+        sys.executable, "-m", "streamlit", "run", os.path.abspath(__file__),
+        "--server.headless", "true",
+        "--server.port", str(port),
+        "--server.address", "127.0.0.1",
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+        "--logger.level", "error",
+        "--",
+        "serve",
+        "--seed-sessions", str(users),
+        "--seed-projects", str(args.seed_projects),
+        "--db-latency-ms", str(args.db_latency_ms),
+        "--claude-latency-ms", str(args.claude_latency_ms),
+    ]
+    process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"Streamlit server exited:\n{log.read().decode(errors='replace')}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Streamlit server did not become healthy within 60s")
+
+
+def server_metrics(pid):
+    """Return (rss_mb, threads) for the server process"""
+    if psutil is not None:
+        process = psutil.Process(pid)
+        return process.memory_info().rss / (1024 * 1024), process.num_threads()
+    rss_mb, threads = 0.0, 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_mb = int(line.split()[1]) / 1024
+            elif line.startswith("Threads:"):
+                threads = int(line.split()[1])
+    return rss_mb, threads
+
+
+class Sampler(threading.Thread):
+    """Samples the server's RSS and thread count in the background"""
+
+    def __init__(self, pid, interval_s=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval_s = interval_s
+        self.stop_event = threading.Event()
+        self.peak_rss_mb, self.peak_threads = server_metrics(pid)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                rss_mb, threads = server_metrics(self.pid)
+            except (OSError, ProcessLookupError):
+                break
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            self.peak_threads = max(self.peak_threads, threads)
+            self.stop_event.wait(self.interval_s)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+# --- Client side ---
+class SimulatedUser:
+    """A browser-less Streamlit client speaking the websocket protocol"""
+
+    def __init__(self, ws, timeout_s):
+        self.ws = ws
+        self.timeout_s = timeout_s
+        self.widget_states = {}
+        self.elements = []
+        self.latencies = []
+
+    def rerun(self, step, trigger_id=None, expect_success=None):
+        """Send a rerun request and block until the script finishes for good.
+
+        The rerun fails if the script raised or showed an st.error alert, or if
+        ``expect_success`` is given and no st.success alert contains it. Only
+        successful reruns are recorded in ``latencies``.
+        """
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = ""
+        for state in self.widget_states.values():
+            back_msg.rerun_script.widget_states.widgets.append(state)
+        if trigger_id:
+            back_msg.rerun_script.widget_states.widgets.append(WidgetState(id=trigger_id, trigger_value=True))
+
+        start = time.perf_counter()
+        self.ws.send(back_msg.SerializeToString())
+
+        from streamlit.proto.Alert_pb2 import Alert
+
+        elements = []
+        errors = []
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv(timeout=self.timeout_s))
+            msg_type = msg.WhichOneof("type")
+            if msg_type == "new_session":
+                elements = []
+            elif msg_type == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors.append(element.exception.message)
+                elif element_type == "alert" and element.alert.format == Alert.ERROR:
+                    errors.append(element.alert.body)
+                elements.append((element_type, getattr(element, element_type)))
+            elif msg_type == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+
+        elapsed = time.perf_counter() - start
+        self.elements = elements
+        if errors:
+            raise RuntimeError(f"{step}: {errors[0]}")
+        if expect_success and not any(
+            element_type == "alert" and proto.format == Alert.SUCCESS and expect_success in proto.body
+            for element_type, proto in elements
+        ):
+            raise RuntimeError(f"{step}: no success message containing {expect_success!r}")
+        self.latencies.append((step, elapsed))
+
+    def find(self, element_type, predicate):
+        for found_type, proto in self.elements:
+            if found_type == element_type and predicate(proto):
+                return proto
+        raise LookupError(f"No {element_type} element matched")
+
+    def set_string(self, widget, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.widget_states[widget.id] = WidgetState(id=widget.id, string_value=value)
+
+    def navigate(self, page):
+        self.set_string(self.find("radio", lambda w: w.label == "Go to"), page)
+        self.rerun(page)
+
+    def click(self, step, button, expect_success=None):
+        self.rerun(step, trigger_id=button.id, expect_success=expect_success)
+
+
+def connect_user(port, timeout_s):
+    from websockets.sync.client import connect
+
+    return connect(
+        f"ws://127.0.0.1:{port}/_stcore/stream",
+        subprotocols=["streamlit"],
+        max_size=None,
+        open_timeout=timeout_s
+    )
+
+
+def run_user(user_index, port, iterations, timeout_s):
+    """Run the full flow for one simulated user; returns (latencies, errors)"""
+    session_key = f"-load_load_test_{user_index}"
+    try:
+        with connect_user(port, timeout_s) as ws:
+            user = SimulatedUser(ws, timeout_s)
+            try:
+                user.rerun("initial load")
+                user.navigate(PAGE_SESSIONS)
+                user.click("load session", user.find("button", lambda w: w.id.endswith(session_key)))
+
+                for i in range(iterations):
+                    user.navigate(PAGE_ADD_PROJECT)
+                    user.set_string(user.find("text_input", lambda w: w.label.startswith("What is the name")),
+                                    f"User {user_index} Project {i}")
+                    user.set_string(user.find("text_area", lambda w: w.label.startswith("Provide a brief")),
+                                    "Automate document triage with an LLM")
+                    user.click("add project", user.find("button", lambda w: w.is_form_submitter),
+                               expect_success="added and saved to database")
+                    user.navigate(PAGE_DASHBOARD)
+                    user.navigate(PAGE_EXPORT)
+            except Exception as e:
+                return user.latencies, [f"user {user_index}: {e}"]
+            return user.latencies, []
+    except Exception as e:
+        return [], [f"user {user_index}: connect failed: {e}"]
+
+
+def warm_up(port, timeout_s):
+    """Run the script once so imports and cached resources don't count against users"""
+    with connect_user(port, timeout_s) as ws:
+        SimulatedUser(ws, timeout_s).rerun("warm-up")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_level(users, args):
+    """Run `users` concurrent flows against a fresh server and return a summary dict"""
+    process, port = start_server(users, args)
+    try:
+        warm_up(port, args.timeout)
+        baseline_rss_mb, baseline_threads = server_metrics(process.pid)
+        sampler = Sampler(process.pid)
+        sampler.start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            results = list(executor.map(
+                lambda i: run_user(i, port, args.iterations, args.timeout),
+                range(users)
+            ))
+        wall_s = time.perf_counter() - start
+        sampler.stop()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    latencies = [latency for user_latencies, _ in results for _, latency in user_latencies]
+    add_latencies = [latency for user_latencies, _ in results for step, latency in user_latencies if step == "add project"]
+    errors = [error for _, user_errors in results for error in user_errors]
+
+    return {
+        "users": users,
+        "reruns": len(latencies),
+        "wall_s": wall_s,
+        "throughput": len(latencies) / wall_s if wall_s else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "add_p50_ms": percentile(add_latencies, 50) * 1000,
+        "mean_ms": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+        "baseline_rss_mb": baseline_rss_mb,
+        "peak_rss_mb": sampler.peak_rss_mb,
+        "rss_per_user_mb": (sampler.peak_rss_mb - baseline_rss_mb) / users,
+        "baseline_threads": baseline_threads,
+        "peak_threads": sampler.peak_threads,
+        "errors": errors,
+    }
+
+
+def print_report(rows):
+    header = (
+        f"{'users':>6} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'add p50':>8} "
+        f"{'RSS MB':>8} {'MB/user':>8} {'threads':>8} {'errors':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['users']:>6} {row['reruns']:>7} {row['throughput']:>8.1f} {row['p50_ms']:>8.0f} "
+            f"{row['p99_ms']:>8.0f} {row['add_p50_ms']:>8.0f} {row['peak_rss_mb']:>8.1f} "
+            f"{row['rss_per_user_mb']:>8.2f} {row['peak_threads']:>8} {len(row['errors']):>7}"
+        )
+    for row in rows:
+        for error in row["errors"][:5]:
+            print(f"  [{row['users']} users] {error}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated users.")
+    parser.add_argument("mode", nargs="?", choices=["run", "serve"], default="run",
+                        help=argparse.SUPPRESS)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 10, 25],
+                        help="Concurrency levels to run, in order (default: 1 5 10 25)")
+    parser.add_argument("--iterations", type=int, default=2,
+                        help="Add/dashboard/export cycles per user (default: 2)")
+    parser.add_argument("--seed-projects", type=int, default=20,
+                        help="Projects pre-loaded into each user's session (default: 20)")
+    parser.add_argument("--seed-sessions", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--db-latency-ms", type=float, default=20,
+                        help="Simulated latency of each Supabase call (default: 20)")
+    parser.add_argument("--claude-latency-ms", type=float, default=1500,
+                        help="Simulated latency of each Claude call (default: 1500)")
+    parser.add_argument("--timeout", type=float, default=120,
+                        help="Per-rerun timeout in seconds (default: 120)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.mode == "serve":
+        serve(args)
+        return
+
+    rows = []
+    for users in args.users:
+        print(f"Running {users} concurrent user(s)...", file=sys.stderr)
+        rows.append(run_level(users, args))
+
+    print_report(rows)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+-- Stamp each stored score with a fingerprint of the scoring inputs it was
+-- computed with (model, prompt, benchmarks, score maps). Rows with a NULL or
+-- outdated fingerprint are picked up by the app's Re-score page.
+alter table projects add column if not exists scoring_fingerprint text;
+
+create index if not exists projects_scoring_fingerprint_idx
+    on projects (scoring_fingerprint);
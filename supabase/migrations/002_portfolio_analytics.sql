@@ -0,0 +1,187 @@
+-- Cross-session portfolio analytics.
+--
+-- A trigger on projects keeps narrow rollup tables current on every insert,
+-- update and delete: category counts per session, score histograms per
+-- session, and score sums per session and creation day, each mirrored by a
+-- global table without session_id. The analytics views read these rollups
+-- directly, so the global category and histogram views return a fixed number
+-- of rows however many projects exist (and never touch the answers blobs).
+
+drop view if exists analytics_category_counts, analytics_global_category_counts,
+    analytics_score_histogram, analytics_global_score_histogram,
+    analytics_daily_trend, analytics_global_daily_trend;
+drop table if exists project_stats;
+
+create table if not exists stats_category (
+    session_id text not null,
+    category text not null,
+    project_count integer not null default 0,
+    primary key (session_id, category)
+);
+
+create table if not exists stats_global_category (
+    category text primary key,
+    project_count integer not null default 0
+);
+
+create table if not exists stats_histogram (
+    session_id text not null,
+    dimension text not null,
+    bucket integer not null,
+    project_count integer not null default 0,
+    primary key (session_id, dimension, bucket)
+);
+
+create table if not exists stats_global_histogram (
+    dimension text not null,
+    bucket integer not null,
+    project_count integer not null default 0,
+    primary key (dimension, bucket)
+);
+
+create table if not exists stats_daily (
+    session_id text not null,
+    day date not null,
+    project_count integer not null default 0,
+    business_value_sum double precision not null default 0,
+    tech_feasibility_sum double precision not null default 0,
+    primary key (session_id, day)
+);
+
+create table if not exists stats_global_daily (
+    day date primary key,
+    project_count integer not null default 0,
+    business_value_sum double precision not null default 0,
+    tech_feasibility_sum double precision not null default 0
+);
+
+create or replace function score_bucket(score double precision)
+returns integer
+language sql
+immutable
+as $$
+    select greatest(0, least(10, floor(coalesce(score, 0))::integer));
+$$;
+
+create or replace function apply_project_stats(p projects, sign integer)
+returns void
+language plpgsql
+as $$
+declare
+    p_category text := coalesce(p.category, 'incremental');
+    p_day date := coalesce(p.created_at, now())::date;
+    p_business double precision := coalesce(p.business_value, 0);
+    p_tech double precision := coalesce(p.tech_feasibility, 0);
+begin
+    -- Category counts
+    insert into stats_category as s (session_id, category, project_count)
+    values (p.session_id, p_category, sign)
+    on conflict (session_id, category) do update
+    set project_count = s.project_count + excluded.project_count;
+
+    insert into stats_global_category as s (category, project_count)
+    values (p_category, sign)
+    on conflict (category) do update
+    set project_count = s.project_count + excluded.project_count;
+
+    -- Score histograms
+    insert into stats_histogram as s (session_id, dimension, bucket, project_count)
+    values (p.session_id, 'business_value', score_bucket(p_business), sign),
+           (p.session_id, 'tech_feasibility', score_bucket(p_tech), sign)
+    on conflict (session_id, dimension, bucket) do update
+    set project_count = s.project_count + excluded.project_count;
+
+    insert into stats_global_histogram as s (dimension, bucket, project_count)
+    values ('business_value', score_bucket(p_business), sign),
+           ('tech_feasibility', score_bucket(p_tech), sign)
+    on conflict (dimension, bucket) do update
+    set project_count = s.project_count + excluded.project_count;
+
+    -- Daily sums
+    insert into stats_daily as s (session_id, day, project_count, business_value_sum, tech_feasibility_sum)
+    values (p.session_id, p_day, sign, sign * p_business, sign * p_tech)
+    on conflict (session_id, day) do update
+    set project_count = s.project_count + excluded.project_count,
+        business_value_sum = s.business_value_sum + excluded.business_value_sum,
+        tech_feasibility_sum = s.tech_feasibility_sum + excluded.tech_feasibility_sum;
+
+    insert into stats_global_daily as s (day, project_count, business_value_sum, tech_feasibility_sum)
+    values (p_day, sign, sign * p_business, sign * p_tech)
+    on conflict (day) do update
+    set project_count = s.project_count + excluded.project_count,
+        business_value_sum = s.business_value_sum + excluded.business_value_sum,
+        tech_feasibility_sum = s.tech_feasibility_sum + excluded.tech_feasibility_sum;
+
+    -- Per-session rows that dropped to zero are removed so deleted sessions
+    -- leave nothing behind
+    if sign < 0 then
+        delete from stats_category
+        where session_id = p.session_id and category = p_category and project_count <= 0;
+        delete from stats_histogram
+        where session_id = p.session_id and project_count <= 0;
+        delete from stats_daily
+        where session_id = p.session_id and day = p_day and project_count <= 0;
+        delete from stats_global_daily
+        where day = p_day and project_count <= 0;
+    end if;
+end;
+$$;
+
+create or replace function projects_stats_trigger()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform apply_project_stats(old, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform apply_project_stats(new, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists projects_stats on projects;
+create trigger projects_stats
+    after insert or update of session_id, created_at, category, business_value, tech_feasibility
+    or delete on projects
+    for each row execute function projects_stats_trigger();
+
+-- Backfill from existing projects
+truncate stats_category, stats_global_category, stats_histogram,
+    stats_global_histogram, stats_daily, stats_global_daily;
+select apply_project_stats(p, 1) from projects p;
+
+-- Category counts
+create view analytics_category_counts as
+select session_id, category, project_count
+from stats_category;
+
+create view analytics_global_category_counts as
+select category, project_count
+from stats_global_category
+where project_count > 0;
+
+-- Score histograms (one row per dimension and integer bucket)
+create view analytics_score_histogram as
+select session_id, dimension, bucket, project_count
+from stats_histogram;
+
+create view analytics_global_score_histogram as
+select dimension, bucket, project_count
+from stats_global_histogram
+where project_count > 0;
+
+-- Daily trends by created_at
+create view analytics_daily_trend as
+select session_id, day, project_count,
+       business_value_sum / nullif(project_count, 0) as avg_business_value,
+       tech_feasibility_sum / nullif(project_count, 0) as avg_tech_feasibility
+from stats_daily;
+
+create view analytics_global_daily_trend as
+select day, project_count,
+       business_value_sum / nullif(project_count, 0) as avg_business_value,
+       tech_feasibility_sum / nullif(project_count, 0) as avg_tech_feasibility
+from stats_global_daily;
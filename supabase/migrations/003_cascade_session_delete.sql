@@ -0,0 +1,25 @@
+-- Delete sessions atomically, with their projects, in a single round trip.
+
+-- Remove projects already orphaned by earlier non-transactional deletes
+delete from projects p
+where not exists (select 1 from sessions s where s.id = p.session_id);
+
+alter table projects drop constraint if exists projects_session_id_fkey;
+alter table projects
+    add constraint projects_session_id_fkey
+    foreign key (session_id) references sessions (id) on delete cascade;
+
+create index if not exists projects_session_id_idx on projects (session_id);
+
+-- Deletes every listed session; projects go with them through the cascade.
+-- Runs as one statement inside the RPC's transaction, so either all listed
+-- sessions and their projects are removed or none are.
+create or replace function delete_sessions(session_ids text[])
+returns integer
+language sql
+as $$
+    with deleted as (
+        delete from sessions where id = any(session_ids) returning id
+    )
+    select count(*)::integer from deleted;
+$$;